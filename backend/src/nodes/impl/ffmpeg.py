@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import zipfile
 from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
@@ -130,7 +131,13 @@ class FFMpegEnv:
         )
 
     @staticmethod
+    @functools.lru_cache(maxsize=4)
     def get_integrated(base_dir: Path) -> FFMpegEnv:
+        """
+        Returns the integrated FFMPEG binaries, downloading them if necessary.
+
+        The result is cached, since the binaries are never removed once set up.
+        """
         base_dir = base_dir.resolve() / "ffmpeg"
         ffmpeg_path, ffprobe_path = get_executable_path(base_dir)
 
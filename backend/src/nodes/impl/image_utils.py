@@ -246,6 +246,35 @@ def as_target_channels(
     raise ValueError(f"Unable to convert {c} channel image to {target_c} channel image")
 
 
+def remove_unnecessary_alpha(img: np.ndarray) -> np.ndarray:
+    """
+    Removes the alpha channel from an image if it is not used.
+    """
+    if get_h_w_c(img)[2] != 4:
+        return img
+
+    alpha = img[:, :, 3]
+    info = _get_iinfo(img)
+    opaque = info.max if info is not None else 1.0
+
+    # Most images with an alpha channel actually use it, so look at a few
+    # pixels before scanning the whole channel.
+    h, w = alpha.shape
+    for y, x in ((0, 0), (0, w - 1), (h - 1, 0), (h - 1, w - 1), (h // 2, w // 2)):
+        if alpha[y, x] != opaque:
+            return img
+
+    if info is not None:
+        # alpha can't be above the max value, so checking the min is enough
+        unnecessary = alpha.min() == info.max
+    else:
+        unnecessary = alpha.min() == 1.0 and alpha.max() == 1.0
+
+    if unnecessary:
+        return img[:, :, :3]
+    return img
+
+
 def create_border(
     img: np.ndarray,
     border_type: BorderType,
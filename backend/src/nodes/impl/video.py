@@ -1,10 +1,21 @@
 from __future__ import annotations
 
+import functools
+import json
+import os
+import queue
+import re
+import sqlite3
 import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass
-from io import BufferedIOBase
+from fractions import Fraction
+from io import RawIOBase
 from pathlib import Path
-from typing import Generator
+from typing import IO, Callable, Generator, Iterator, Union
 
 import cv2
 import ffmpeg
@@ -13,6 +24,410 @@ from sanic.log import logger
 
 from .ffmpeg import FFMpegEnv
 
+try:
+    import fcntl
+except ImportError:
+    # not available on Windows
+    fcntl = None
+
+_FRAME_RING_SIZE = 3
+"""
+The number of frame buffers that `stream_frames` cycles through.
+
+Frames are decoded into preallocated buffers that are reused. A yielded frame
+stays valid until the next frame is requested. At any time, one buffer is held
+by the consumer, one is ready to be handed out, and one is being filled.
+"""
+
+
+_SWS_FLAGS = "lanczos+accurate_rnd+full_chroma_int+full_chroma_inp+bitexact"
+_SWS_FLAGS_FAST = "bilinear+accurate_rnd"
+"""
+Scaler flags used by `VideoLoader` to convert decoded frames to BGR.
+
+No scaling happens, so these only affect chroma upsampling. The default flags
+are bit-exact. The fast flags are quicker, but they visibly smear chroma at
+color edges (channel values can be off by more than half the range there),
+which later processing like upscaling amplifies.
+"""
+
+
+_CAPTURE_READ_TIMEOUT_MS = 2000
+"""
+How long reading a frame from a capture device may take before it fails.
+"""
+
+
+_V4L2_FOURCC: dict[str, str] = {
+    "mjpeg": "MJPG",
+    "yuyv422": "YUYV",
+    "bgr24": "BGR3",
+    "gray": "GREY",
+}
+"""
+Maps the pixel formats of capture devices to their V4L2 FOURCC codes.
+"""
+
+
+def _allocate_frame_ring(height: int, width: int) -> list[np.ndarray]:
+    return [np.empty((height, width, 3), np.uint8) for _ in range(_FRAME_RING_SIZE)]
+
+
+def _read_frame_into(
+    readinto: Callable[[memoryview], int | None], view: memoryview
+) -> int:
+    """
+    Fills the given byte view of a frame buffer using the given `readinto`.
+
+    Pipes may return fewer bytes than requested, so this keeps reading until the
+    frame is complete. Returns the number of bytes read, which is less than the
+    frame size if the stream ended before that.
+    """
+    frame_size = len(view)
+    got = readinto(view) or 0
+    while 0 < got < frame_size:
+        read = readinto(view[got:])
+        if not read:
+            break
+        got += read
+    return got
+
+
+_FAST_PROBE_ARGS = {"probesize": 32 * 1024, "analyzeduration": 100_000}
+"""
+Limits how much of the input ffprobe reads and analyses before reporting.
+
+Everything we need is usually in the container header, so this avoids the
+default multi-second analysis. `analyzeduration` is in microseconds (0 would
+mean the default of 5 seconds). If the clamped probe comes back incomplete, the
+probe is repeated without these limits.
+"""
+
+
+def _is_usable_probe(probe: dict, needs_length: bool) -> bool:
+    video_stream = next(
+        (s for s in probe.get("streams", []) if s.get("codec_type") == "video"),
+        None,
+    )
+    if video_stream is None:
+        return False
+    if not video_stream.get("width") or not video_stream.get("height"):
+        return False
+    if video_stream.get("r_frame_rate", "0/0").startswith("0"):
+        return False
+    if needs_length:
+        return (
+            video_stream.get("nb_frames") is not None
+            or video_stream.get("duration") is not None
+            or probe.get("format", {}).get("duration") is not None
+        )
+    return True
+
+
+def _probe(path: str, ffprobe: str, needs_length: bool, **kwargs: str) -> dict:
+    try:
+        probe = ffmpeg.probe(path, cmd=ffprobe, **_FAST_PROBE_ARGS, **kwargs)
+        if _is_usable_probe(probe, needs_length):
+            return probe
+    except ffmpeg.Error:
+        pass
+
+    logger.debug(f"Fast probe of {path} was incomplete, probing fully.")
+    return ffmpeg.probe(path, cmd=ffprobe, **kwargs)
+
+
+def _enlarge_pipe(pipe: RawIOBase, frame_size: int) -> None:
+    """
+    Tries to grow the kernel buffer of the given pipe, so that large frames can
+    be read with fewer syscalls. This only works on Linux and is a no-op
+    elsewhere.
+    """
+    if fcntl is None or sys.platform != "linux":
+        return
+
+    # only exposed by `fcntl` since 3.10
+    set_pipe_size = getattr(fcntl, "F_SETPIPE_SZ", 1031)
+
+    # Unprivileged processes may not go above /proc/sys/fs/pipe-max-size
+    # (1 MiB by default), so fall back to that if the full size is refused.
+    for size in (max(frame_size * 2, 1 << 20), 1 << 20):
+        try:
+            fcntl.fcntl(pipe.fileno(), set_pipe_size, size)
+            return
+        except OSError:
+            pass
+
+
+_PREFETCH_SIZE = 8 * 1024 * 1024
+"""
+How much of the start of a video file is prefetched into the page cache.
+"""
+
+
+def _prefetch_file(path: Path) -> None:
+    """
+    Asks the kernel to start reading the beginning of the given file into the
+    page cache, so that ffprobe and ffmpeg don't have to wait for the disk.
+    This is only supported on POSIX systems and is a no-op elsewhere.
+
+    Only WILLNEED is used, because the page cache is shared between processes.
+    Advice like SEQUENTIAL only applies to our own file descriptor, and ffmpeg
+    opens its own.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, _PREFETCH_SIZE, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _log_stderr(stderr: IO[bytes], path: Path) -> None:
+    """
+    Forwards the error output of an ffmpeg process to the log until the process
+    exits. The pipe has to be drained, or ffmpeg would block once it's full.
+    """
+    try:
+        with stderr:
+            for line in stderr:
+                message = line.decode(errors="replace").rstrip()
+                if message:
+                    logger.warning(f"FFMPEG ({path}): {message}")
+    except (OSError, ValueError):
+        # the pipe broke, e.g. because the process was killed
+        pass
+
+
+def _read_only_view(frame: np.ndarray) -> np.ndarray:
+    view = frame.view()
+    view.setflags(write=False)
+    return view
+
+
+_ReadItem = Union[np.ndarray, Exception, None]
+
+
+class _FrameReader:
+    """
+    Reads frames on a background thread, so that reading the next frame overlaps
+    with whatever the consumer does with the current one.
+
+    Frames are read into a fixed pool of buffers. A buffer is handed back to the
+    pool when the consumer asks for the next frame. If `drop_stale` is set, a
+    frame the consumer hasn't picked up yet is replaced by a newer one, which
+    keeps live sources at most one frame behind. Otherwise, reading blocks until
+    the consumer catches up, so no frame is lost.
+
+    If `should_stop` is given, it is polled while waiting for a frame, and
+    iteration ends as soon as it returns `True`. This way, a stalled source
+    can't keep the consumer waiting.
+    """
+
+    def __init__(
+        self,
+        read_into: Callable[[np.ndarray], bool],
+        slots: list[np.ndarray],
+        drop_stale: bool,
+        should_stop: Callable[[], bool] | None = None,
+    ):
+        self._read_into = read_into
+        self._drop_stale = drop_stale
+        self._should_stop = should_stop
+        self._free: queue.Queue[np.ndarray] = queue.Queue()
+        for slot in slots:
+            self._free.put(slot)
+        # Consumers get read-only views, so they can't scribble over a buffer
+        # that is about to be reused.
+        self._read_only = {id(slot): _read_only_view(slot) for slot in slots}
+        self._ready: queue.Queue[_ReadItem] = queue.Queue(maxsize=1)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        read_into = self._read_into
+        drop_stale = self._drop_stale
+        stopped = self._stopped.is_set
+        free_get = self._free.get
+        free_put = self._free.put
+        ready_get_nowait = self._ready.get_nowait
+        try:
+            while not stopped():
+                try:
+                    slot = free_get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if not read_into(slot):
+                    break
+                if drop_stale:
+                    try:
+                        stale = ready_get_nowait()
+                    except queue.Empty:
+                        pass
+                    else:
+                        # only frames are put before the thread ends
+                        assert isinstance(stale, np.ndarray)
+                        free_put(stale)
+                self._put(slot)
+        except Exception as e:
+            self._put(e)
+        self._put(None)
+
+    def _put(self, item: _ReadItem):
+        while not self._stopped.is_set():
+            try:
+                self._ready.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _get(self) -> _ReadItem:
+        should_stop = self._should_stop
+        if should_stop is None:
+            return self._ready.get()
+
+        while not should_stop():
+            try:
+                return self._ready.get(timeout=0.05)
+            except queue.Empty:
+                pass
+        return None
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        read_only = self._read_only
+        get = self._get
+        previous = None
+        while True:
+            item = get()
+            if previous is not None:
+                self._free.put(previous)
+                previous = None
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield read_only[id(item)]
+            previous = item
+
+    @property
+    def running(self) -> bool:
+        """Whether the reader thread is still running."""
+        return self._thread.is_alive()
+
+    def stop(self):
+        """
+        Stops the reader thread. The caller must make sure that a pending read
+        returns, e.g. by killing the process that is read from.
+        """
+        self._stopped.set()
+        self._thread.join(timeout=5)
+
+
+_PROBE_CACHE_FILE = "ffprobe-cache.sqlite"
+
+
+@contextmanager
+def _open_probe_cache(cache_dir: Path) -> Iterator[sqlite3.Connection]:
+    """
+    Opens the on-disk cache of ffprobe results in a transaction.
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(cache_dir / _PROBE_CACHE_FILE, timeout=5)
+    try:
+        with db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS probes ("
+                "path TEXT NOT NULL, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL,"
+                " probe TEXT NOT NULL, PRIMARY KEY (path, mtime_ns, size))"
+            )
+            yield db
+    finally:
+        db.close()
+
+
+def _probe_file_cached_on_disk(
+    path: str, mtime_ns: int, size: int, ffprobe: str, cache_dir: Path
+) -> dict:
+    try:
+        with _open_probe_cache(cache_dir) as db:
+            row = db.execute(
+                "SELECT probe FROM probes WHERE path = ? AND mtime_ns = ? AND size = ?",
+                (path, mtime_ns, size),
+            ).fetchone()
+        if row is not None:
+            return json.loads(row[0])
+    except (sqlite3.Error, ValueError) as e:
+        logger.warning(f"Failed to read the ffprobe cache: {e}")
+
+    probe = _probe(path, ffprobe, needs_length=True)
+
+    try:
+        with _open_probe_cache(cache_dir) as db:
+            # drop the entries of older versions of the file
+            db.execute("DELETE FROM probes WHERE path = ?", (path,))
+            db.execute(
+                "INSERT INTO probes VALUES (?, ?, ?, ?)",
+                (path, mtime_ns, size, json.dumps(probe)),
+            )
+    except sqlite3.Error as e:
+        logger.warning(f"Failed to write the ffprobe cache: {e}")
+
+    return probe
+
+
+@functools.lru_cache(maxsize=128)
+def _probe_file(
+    path: str, mtime_ns: int, size: int, ffprobe: str, cache_dir: Path | None
+) -> dict:
+    # `mtime_ns` and `size` are only part of the cache key, so that the file is
+    # probed again if it changes.
+    if cache_dir is not None:
+        return _probe_file_cached_on_disk(path, mtime_ns, size, ffprobe, cache_dir)
+    return _probe(path, ffprobe, needs_length=True)
+
+
+_DEVICE_PROBE_TTL = 30.0
+"""
+How long (in seconds) the probe result of a capture device is reused.
+"""
+
+_device_probes: dict[tuple[str, str], tuple[float, dict]] = {}
+
+
+def _probe_device(path: str, ffprobe: str) -> dict:
+    # Devices can't be stat'ed for changes, so their probe results expire instead.
+    key = (path, ffprobe)
+    now = time.monotonic()
+    cached = _device_probes.get(key)
+    if cached is not None and now - cached[0] < _DEVICE_PROBE_TTL:
+        return cached[1]
+
+    probe = _probe(path, ffprobe, needs_length=False, format="v4l2")
+    _device_probes[key] = (now, probe)
+    return probe
+
+
+def _parse_frame_rate(video_stream: dict) -> float:
+    """
+    Parses the `r_frame_rate` of a probed stream, e.g. "30000/1001".
+
+    ffprobe reports "0/0" if the frame rate is unknown, which is parsed as 0.
+    """
+    rate = video_stream.get("r_frame_rate", None)
+    if rate is None:
+        raise RuntimeError("No fps found in video stream")
+    try:
+        return float(Fraction(rate))
+    except ZeroDivisionError:
+        return 0.0
+
 
 @dataclass(frozen=True)
 class VideoMetadata:
@@ -22,8 +437,17 @@ class VideoMetadata:
     frame_count: int
 
     @staticmethod
-    def from_file(path: Path, ffmpeg_env: FFMpegEnv):
-        probe = ffmpeg.probe(path, cmd=ffmpeg_env.ffprobe)
+    def from_file(path: Path, ffmpeg_env: FFMpegEnv, cache_dir: Path | None = None):
+        """
+        Reads the metadata of the given video file.
+
+        If `cache_dir` is given, probe results are also cached on disk there, so
+        that unchanged files don't have to be probed again in later sessions.
+        """
+        stat = path.stat()
+        probe = _probe_file(
+            str(path), stat.st_mtime_ns, stat.st_size, ffmpeg_env.ffprobe, cache_dir
+        )
         video_format = probe.get("format", None)
         if video_format is None:
             raise RuntimeError("Failed to get video format. Please report.")
@@ -45,10 +469,7 @@ class VideoMetadata:
             raise RuntimeError("No height found in video stream")
         height = int(height)
 
-        fps = video_stream.get("r_frame_rate", None)
-        if fps is None:
-            raise RuntimeError("No fps found in video stream")
-        fps = int(fps.split("/")[0]) / int(fps.split("/")[1])
+        fps = _parse_frame_rate(video_stream)
 
         frame_count = video_stream.get("nb_frames", None)
         if frame_count is None:
@@ -72,7 +493,7 @@ class VideoMetadata:
 
     @staticmethod
     def from_device(path: Path, ffmpeg_env: FFMpegEnv):
-        probe = ffmpeg.probe(path, format="v4l2", cmd=ffmpeg_env.ffprobe)
+        probe = _probe_device(str(path), ffmpeg_env.ffprobe)
         video_format = probe.get("format", None)
         if video_format is None:
             raise RuntimeError("Failed to get video format. Please report.")
@@ -94,10 +515,7 @@ class VideoMetadata:
             raise RuntimeError("No height found in video stream")
         height = int(height)
 
-        fps = video_stream.get("r_frame_rate", None)
-        if fps is None:
-            raise RuntimeError("No fps found in video stream")
-        fps = int(fps.split("/")[0]) / int(fps.split("/")[1])
+        fps = _parse_frame_rate(video_stream)
 
         # frame_count = video_stream.get("nb_frames", None)
         # if frame_count is None:
@@ -121,48 +539,163 @@ class VideoMetadata:
 
 
 class VideoLoader:
-    def __init__(self, path: Path, ffmpeg_env: FFMpegEnv):
+    def __init__(
+        self,
+        path: Path,
+        ffmpeg_env: FFMpegEnv,
+        fast_color_conversion: bool = False,
+        hwaccel: str | None = None,
+        cache_dir: Path | None = None,
+    ):
+        """
+        `hwaccel` is passed to ffmpeg's `-hwaccel` option (e.g. "auto" or
+        "cuda"). Decoded frames are downloaded from the GPU automatically, and
+        ffmpeg falls back to software decoding if the method isn't available.
+
+        `cache_dir` is where video metadata is cached, see `VideoMetadata.from_file`.
+        """
         self.path = path
         self.ffmpeg_env = ffmpeg_env
-        self.metadata = VideoMetadata.from_file(path, ffmpeg_env)
-        logger.info(
+        self.fast_color_conversion = fast_color_conversion
+        self.hwaccel = hwaccel
+        self._audio_stream = None
+        _prefetch_file(path)
+
+        # The decoder command line is the same for every stream, so it is only
+        # built once.
+        self._reader_args = self._build_reader_args()
+
+        # Start the decoder right away. It doesn't depend on the metadata, so
+        # ffmpeg starts up while ffprobe is running, and by the time the first
+        # frame is requested its output is already waiting in the pipe.
+        self._warm_reader: subprocess.Popen | None = self._spawn_reader()
+        try:
+            self.metadata = VideoMetadata.from_file(path, ffmpeg_env, cache_dir)
+        except Exception:
+            self.close()
+            raise
+        logger.debug(
             f"VideoLoader instantiated with metadata {self.metadata}, id: {id(self)}"
         )
 
-    def get_audio_stream(self):
-        return ffmpeg.input(self.path).audio
+    def __del__(self):
+        self.close()
 
-    def stream_frames(self):
+    def close(self):
         """
-        Returns an iterator that yields frames as BGR uint8 numpy arrays.
+        Stops the decoder started in advance, if `stream_frames` never used it.
         """
+        warm_reader = getattr(self, "_warm_reader", None)
+        self._warm_reader = None
+        if warm_reader is not None:
+            with warm_reader:
+                warm_reader.kill()
 
-        ffmpeg_reader = (
-            ffmpeg.input(self.path)
+    def get_audio_stream(self):
+        if self._audio_stream is None:
+            self._audio_stream = ffmpeg.input(self.path).audio
+        return self._audio_stream
+
+    def _build_reader_args(self) -> list[str]:
+        input_kwargs = {}
+        if self.hwaccel:
+            input_kwargs["hwaccel"] = self.hwaccel
+
+        # The flags are ignored for bgr24 sources, since those don't go through
+        # the scaler at all.
+        sws_flags = _SWS_FLAGS_FAST if self.fast_color_conversion else _SWS_FLAGS
+
+        return (
+            ffmpeg.input(
+                self.path,
+                threads=0,
+                thread_type="frame+slice",
+                **input_kwargs,
+            )
             .output(
                 "pipe:",
                 format="rawvideo",
                 pix_fmt="bgr24",
-                sws_flags="lanczos+accurate_rnd+full_chroma_int+full_chroma_inp+bitexact",
                 loglevel="error",
+                sws_flags=sws_flags,
             )
-            .run_async(pipe_stdout=True, pipe_stderr=False, cmd=self.ffmpeg_env.ffmpeg)
+            .compile(cmd=self.ffmpeg_env.ffmpeg)
+        )
+
+    def _spawn_reader(self) -> subprocess.Popen:
+        # Frames are read straight into their buffers, so stdout is unbuffered.
+        # A buffered reader would only add a copy per frame.
+        process = subprocess.Popen(
+            self._reader_args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0,
         )
-        assert isinstance(ffmpeg_reader, subprocess.Popen)
+        assert process.stderr is not None
+        threading.Thread(
+            target=_log_stderr, args=(process.stderr, self.path), daemon=True
+        ).start()
+        # The logging thread owns stderr now and closes it when done. Popen must
+        # not close it while the thread is still reading.
+        process.stderr = None
+        return process
+
+    def stream_frames(self):
+        """
+        Returns an iterator that yields frames as BGR uint8 numpy arrays.
+
+        Yielded frames are read-only views of a ring of reused buffers, so they
+        will be overwritten by later frames. Copy a frame if it needs to be kept
+        around.
+        """
+
+        ffmpeg_reader = self._warm_reader or self._spawn_reader()
+        self._warm_reader = None
 
         with ffmpeg_reader:
-            assert isinstance(ffmpeg_reader.stdout, BufferedIOBase)
+            assert isinstance(ffmpeg_reader.stdout, RawIOBase)
 
             width = self.metadata.width
             height = self.metadata.height
-
-            while True:
-                in_bytes = ffmpeg_reader.stdout.read(width * height * 3)
-                if not in_bytes:
+            _enlarge_pipe(ffmpeg_reader.stdout, width * height * 3)
+
+            # Everything the reader needs per frame is bound once here, including
+            # the byte views of the (fixed) frame buffers.
+            slots = _allocate_frame_ring(height, width)
+            views = {id(slot): memoryview(slot).cast("B") for slot in slots}
+            readinto = ffmpeg_reader.stdout.readinto
+
+            def read_into(frame: np.ndarray) -> bool:
+                view = views[id(frame)]
+                got = _read_frame_into(readinto, view)
+                if got == len(view):
+                    return True
+
+                # The process is only looked at once its output has ended.
+                # Negative codes mean we killed it ourselves, so a partial
+                # frame is expected then.
+                returncode = ffmpeg_reader.wait()
+                if returncode > 0:
+                    logger.warning(
+                        f"FFMPEG exited with code {returncode} while reading {self.path}"
+                    )
+                if returncode >= 0 and got > 0:
+                    logger.warning(
+                        f"Stream ended in the middle of a frame ({got} of {len(view)} bytes)."
+                        " The incomplete frame was dropped."
+                    )
+                elif returncode <= 0:
                     logger.debug("Can't receive frame (stream end?). Exiting ...")
-                    break
+                return False
 
-                yield np.frombuffer(in_bytes, np.uint8).reshape([height, width, 3])
+            reader = _FrameReader(read_into, slots, drop_stale=False)
+            try:
+                yield from reader
+            finally:
+                # unblock the reader thread if we stopped before the end
+                if ffmpeg_reader.poll() is None:
+                    ffmpeg_reader.kill()
+                reader.stop()
 
 
 class VideoCapture:
@@ -174,16 +707,50 @@ class VideoCapture:
     def __init__(
         self,
         path: Path,
-        ffmpeg_env: FFMpegEnv,
+        ffmpeg_env: FFMpegEnv | None = None,
         pix_fmt: str = "bgr24",
         resolution: str = "640x480",
     ):
         # path is expected to be like '/dev/video0' or an integer index
-        try:
-            device_index = int(str(path).replace("/dev/video", ""))
-        except Exception:
-            device_index = 0
+        match = re.fullmatch(r"(?:/dev/video)?(\d+)", str(path))
+        if match is None:
+            raise RuntimeError(
+                f'"{path}" is not a capture device. Expected a path like /dev/video0.'
+            )
+        device_index = int(match.group(1))
         self.cap = cv2.VideoCapture(device_index, cv2.CAP_V4L2)
+        if not self.cap.isOpened():
+            raise RuntimeError(f'The capture device "{path}" could not be opened.')
+        # V4L2 queues 4 frames by default, which makes every frame we read a few
+        # frames stale. We only ever want the newest frame.
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        # A stalled device (e.g. unplugged) would otherwise block a read for
+        # OpenCV's default 10 seconds, keeping the reader thread from stopping.
+        # Backends that don't support this keep their default.
+        self.cap.set(cv2.CAP_PROP_READ_TIMEOUT_MSEC, _CAPTURE_READ_TIMEOUT_MS)
+        # Whatever the device sends, let the backend convert it to BGR in C so
+        # frames never need to be converted in Python.
+        self.cap.set(cv2.CAP_PROP_CONVERT_RGB, 1)
+        self.width, self.height, self.fps = self._apply_settings(pix_fmt, resolution)
+        logger.info(f"OpenCV VideoCapture initialized at {self.width}x{self.height}")
+
+    def configure(self, pix_fmt: str, resolution: str):
+        """
+        Changes the pixel format and resolution of the open device.
+
+        This is a lot faster than opening the device again. It must not be
+        called while frames are being streamed.
+        """
+        self.width, self.height, self.fps = self._apply_settings(pix_fmt, resolution)
+
+    def _apply_settings(self, pix_fmt: str, resolution: str) -> tuple[int, int, float]:
+        """
+        Requests the given pixel format and resolution from the device, and
+        returns the width, height, and FPS the device actually settled on.
+        """
+        fourcc = _V4L2_FOURCC.get(pix_fmt)
+        if fourcc is not None:
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
         try:
             w_str, h_str = resolution.lower().split("x")
             width = int(w_str)
@@ -192,17 +759,75 @@ class VideoCapture:
             width, height = 640, 480
         self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
         self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
-        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        logger.info(f"OpenCV VideoCapture initialized at {self.width}x{self.height}")
+        return (
+            int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            self.cap.get(cv2.CAP_PROP_FPS) or 30.0,
+        )
 
-    def stream_frames(self) -> Generator[np.ndarray, None, None]:
-        while True:
-            ret, frame = self.cap.read()
+    def stream_frames(
+        self, should_stop: Callable[[], bool] | None = None
+    ) -> Generator[np.ndarray, None, None]:
+        """
+        Returns an iterator that yields frames as BGR uint8 numpy arrays.
+
+        Yielded frames are read-only views of a ring of reused buffers, so they
+        will be overwritten by later frames. Copy a frame if it needs to be kept
+        around.
+
+        The iterator ends once `should_stop` returns `True`, even while waiting
+        for the device to deliver a frame.
+        """
+
+        # Drivers don't always honour the requested resolution, so the ring is
+        # sized from the first frame rather than from the reported frame size.
+        ret, first_frame = self.cap.read()
+        if not ret:
+            logger.warning("OpenCV failed to read frame from camera.")
+            return
+
+        read = self.cap.read
+
+        def read_into(frame: np.ndarray) -> bool:
+            ret, out = read(frame)
             if not ret:
                 logger.warning("OpenCV failed to read frame from camera.")
-                break
-            yield frame
+                return False
+            if out is not frame:
+                # OpenCV only decodes into the given buffer if the frame fits.
+                # Otherwise it allocates a new array and the buffer would be
+                # handed out again with stale contents.
+                logger.warning(
+                    f"Camera frame size changed from {frame.shape} to {out.shape}."
+                )
+                return False
+            return True
+
+        # Keep reading from the device even while the consumer is busy, and only
+        # ever hand out the newest frame. This also keeps the driver's queue
+        # from filling up with stale frames.
+        slots = [np.empty_like(first_frame) for _ in range(_FRAME_RING_SIZE)]
+        reader = _FrameReader(
+            read_into, slots, drop_stale=True, should_stop=should_stop
+        )
+        try:
+            yield _read_only_view(first_frame)
+            yield from reader
+        finally:
+            reader.stop()
+
+    def read_frame(self) -> np.ndarray:
+        """
+        Reads a single frame as a BGR uint8 numpy array.
+
+        The device may have queued a frame since it was last read, so that one
+        is dropped in favor of a fresh one.
+        """
+        self.cap.grab()
+        ret, frame = self.cap.read()
+        if not ret:
+            raise RuntimeError("OpenCV failed to read frame from camera.")
+        return frame
 
     def cleanup(self):
         self.cap.release()
@@ -27,7 +27,7 @@ class CachedNumpyArray:
 
     def value(self) -> np.ndarray:
         self.file.seek(0)
-        return np.frombuffer(self.file.read(), dtype=self.dtype).reshape(self.shape)
+        return np.ndarray(self.shape, dtype=self.dtype, buffer=self.file.read())
 
 
 CacheKey = NewType("CacheKey", tuple)
@@ -1,54 +1,31 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Callable, Union
+from typing import Callable
 
-import cv2
 import numpy as np
-import pillow_avif  # type: ignore # noqa: F401
 from sanic.log import logger
 
+from api import NodeContext
+from nodes.impl.video import VideoCapture
 from nodes.properties.inputs import FileInput
 from nodes.properties.outputs import (
     FileNameOutput,
     LargeImageOutput,
     NumberOutput,
 )
-from nodes.utils.utils import get_h_w_c
 
 from .. import io_group
 
-_Decoder = Callable[[Path], Union[np.ndarray, None]]
+_captures: dict[str, tuple[VideoCapture, Callable[[], None]]] = {}
 """
-An image decoder.
-
-Of the given image is naturally not supported, the decoder may return `None`
-instead of raising an exception. E.g. when the file extension indicates an
-unsupported format.
+Capture devices that are kept open until the end of the current chain run,
+along with the cleanup function that releases them.
 """
 
 
-def remove_unnecessary_alpha(img: np.ndarray) -> np.ndarray:
-    """
-    Removes the alpha channel from an image if it is not used.
-    """
-    if get_h_w_c(img)[2] != 4:
-        return img
-
-    unnecessary = (
-        (img.dtype == np.uint8 and np.all(img[:, :, 3] == 255))
-        or (img.dtype == np.uint16 and np.all(img[:, :, 3] == 65536))
-        or (img.dtype == np.float32 and np.all(img[:, :, 3] == 1.0))
-        or (img.dtype == np.float64 and np.all(img[:, :, 3] == 1.0))
-    )
-
-    if unnecessary:
-        return img[:, :, :3]
-    return img
-
-
 @io_group.register(
-    schema_id="chainner:image:load",
+    schema_id="chainner:image:get_frame_from_capture_device",
     name="Get Frame from Capture Device",
     description=(
         "Get a frame from the specified capture device. This node will output the captured frame"
@@ -75,38 +52,48 @@ def remove_unnecessary_alpha(img: np.ndarray) -> np.ndarray:
         )
         .suggest(),
         NumberOutput("Frames Available").with_docs(
-            "The number of frames available from the capture device."
+            "The number of frames available from the capture device. Always 0"
+            " for live devices."
         ),
         FileNameOutput("Capture Device Path", of_input=0).with_docs(
             "The path of the capture device."
         ),
     ],
+    node_context=True,
     side_effects=True,
 )
-def get_frame_from_capture_device_node(path: Path) -> tuple[np.ndarray, int, str]:
+def get_frame_from_capture_device_node(
+    node_context: NodeContext, path: Path
+) -> tuple[np.ndarray, int, str]:
     logger.debug(f"Getting frame from capture device: {path}")
 
-    img = None
-    error = None
-    frame_count = 0
-    try:
-        cap = cv2.VideoCapture(str(path))
-        if not cap.isOpened():
+    # Opening a device is slow, so it stays open while the chain is running,
+    # e.g. when this node is run once per iteration.
+    key = str(path)
+    entry = _captures.get(key)
+    if entry is None:
+        try:
+            capture = VideoCapture(path)
+        except Exception as e:
             raise RuntimeError(
                 f'The capture device "{path}" you are trying to get the frame from cannot be read by chaiNNer.'
-            )
+            ) from e
 
-        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        ret, img = cap.read()
-        cap.release()
-    except Exception as e:
-        error = e
+        def release_capture():
+            released = _captures.pop(key, None)
+            if released is not None:
+                released[0].cleanup()
 
-    if img is None:
-        if error is not None:
-            raise error
-        raise RuntimeError(
-            f'The capture device "{path}" you are trying to get the frame from cannot be read by chaiNNer.'
-        )
+        entry = capture, release_capture
+        _captures[key] = entry
+
+    capture, release_capture = entry
+    # Chain cleanups are skipped if a run is aborted or fails, so every run has
+    # to register it again. The same function is only called once per run.
+    node_context.add_cleanup(release_capture, after="chain")
+
+    img = capture.read_frame()
 
-    return img, frame_count, str(path)
+    # Live devices have no frame count. V4L2 reports garbage for it and may
+    # block while doing so, so it is not queried.
+    return img, 0, str(path)
@@ -17,6 +17,7 @@ from nodes.impl.image_formats import (
     get_opencv_formats,
     get_pil_formats,
 )
+from nodes.impl.image_utils import remove_unnecessary_alpha
 from nodes.properties.inputs import ImageFileInput
 from nodes.properties.outputs import DirectoryOutput, FileNameOutput, LargeImageOutput
 from nodes.utils.utils import get_h_w_c, split_file_path
@@ -33,47 +34,27 @@ unsupported format.
 """
 
 
-def get_ext(path: Path | str) -> str:
-    return split_file_path(path)[2].lower()
-
-
-def remove_unnecessary_alpha(img: np.ndarray) -> np.ndarray:
-    """
-    Removes the alpha channel from an image if it is not used.
-    """
-    if get_h_w_c(img)[2] != 4:
-        return img
+_OPENCV_FORMATS = frozenset(get_opencv_formats())
+_PIL_FORMATS = frozenset(get_pil_formats())
 
-    unnecessary = (
-        (img.dtype == np.uint8 and np.all(img[:, :, 3] == 255))
-        or (img.dtype == np.uint16 and np.all(img[:, :, 3] == 65536))
-        or (img.dtype == np.float32 and np.all(img[:, :, 3] == 1.0))
-        or (img.dtype == np.float64 and np.all(img[:, :, 3] == 1.0))
-    )
 
-    if unnecessary:
-        return img[:, :, :3]
-    return img
+def get_ext(path: Path | str) -> str:
+    return split_file_path(path)[2].lower()
 
 
 def _read_cv(path: Path) -> np.ndarray | None:
-    if get_ext(path) not in get_opencv_formats():
+    if get_ext(path) not in _OPENCV_FORMATS:
         # not supported
         return None
 
-    img = None
+    # cv2.imread would use the same decoder, so there is no point in retrying
+    # with it if decoding fails.
     try:
         img = cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
-    except Exception as cv_err:
-        logger.warning(f"Error loading image, trying with imdecode: {cv_err}")
-
-    if img is None:
-        try:
-            img = cv2.imread(str(path), cv2.IMREAD_UNCHANGED)
-        except Exception as e:
-            raise RuntimeError(
-                f'Error reading image image from path "{path}". Image may be corrupt.'
-            ) from e
+    except Exception as e:
+        raise RuntimeError(
+            f'Error reading image image from path "{path}". Image may be corrupt.'
+        ) from e
 
     if img is None:  # type: ignore
         raise RuntimeError(
@@ -84,7 +65,7 @@ def _read_cv(path: Path) -> np.ndarray | None:
 
 
 def _read_pil(path: Path) -> np.ndarray | None:
-    if get_ext(path) not in get_pil_formats():
+    if get_ext(path) not in _PIL_FORMATS:
         # not supported
         return None
 
@@ -93,7 +74,9 @@ def _read_pil(path: Path) -> np.ndarray | None:
         # convert color palette to actual colors
         im = im.convert(im.palette.mode)
 
-    img = np.array(im)
+    # Pillow hands out its pixel data through the array interface, so this
+    # doesn't copy it again. The result may be read-only.
+    img = np.asarray(im)
     _, _, c = get_h_w_c(img)
     if c == 3:
         img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
@@ -121,22 +104,21 @@ def _read_dds(path: Path) -> np.ndarray | None:
         os.remove(png)
 
 
-def _for_ext(ext: str | Iterable[str], decoder: _Decoder) -> _Decoder:
-    ext_set: set[str] = set()
-    if isinstance(ext, str):
-        ext_set.add(ext)
-    else:
-        ext_set.update(ext)
+_decoders: dict[str, list[tuple[str, _Decoder]]] = {}
+"""
+The decoders to try for each file extension, in order.
+"""
+
 
-    return lambda path: decoder(path) if get_ext(path) in ext_set else None
+def _add_decoder(name: str, exts: Iterable[str], decoder: _Decoder):
+    for ext in exts:
+        _decoders.setdefault(ext, []).append((name, decoder))
 
 
-_decoders: list[tuple[str, _Decoder]] = [
-    ("pil-jpeg", _for_ext([".jpg", ".jpeg"], _read_pil)),
-    ("cv", _read_cv),
-    ("texconv-dds", _read_dds),
-    ("pil", _read_pil),
-]
+_add_decoder("pil-jpeg", [".jpg", ".jpeg"], _read_pil)
+_add_decoder("cv", _OPENCV_FORMATS, _read_cv)
+_add_decoder("texconv-dds", [".dds"], _read_dds)
+_add_decoder("pil", _PIL_FORMATS, _read_pil)
 
 valid_formats = get_available_image_formats()
 
@@ -175,7 +157,7 @@ def load_image_node(path: Path) -> tuple[np.ndarray, Path, str]:
 
     img = None
     error = None
-    for name, decoder in _decoders:
+    for name, decoder in _decoders.get(get_ext(path), []):
         try:
             img = decoder(Path(path))
         except Exception as e:
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from enum import Enum
 from pathlib import Path
+from weakref import WeakValueDictionary
 
 import numpy as np
 from sanic.log import logger
@@ -40,26 +41,38 @@ class Resolution(str, Enum):
 
 class VideoCaptureState:
     def __init__(
-        self, path: Path, ffmpeg_env: FFMpegEnv, pix_fmt: str, resolution: str
+        self,
+        path: Path,
+        ffmpeg_env: FFMpegEnv,
+        pix_fmt: PixelFormat,
+        resolution: Resolution,
     ):
         self.path = path
+        self.video_dir, self.video_name, _ = split_file_path(path)
         self.ffmpeg_env = ffmpeg_env
         self.pix_fmt = pix_fmt
         self.resolution = resolution
-        self.loader = None
+        self.loader: VideoCapture | None = None
         self.frame_index = 0
         self._create_loader()
 
-    def _create_loader(self):
+    def _create_loader(self) -> VideoCapture:
         """Create a new VideoCapture instance"""
         # Handle AUTO format by detecting device capabilities
-        actual_pix_fmt = self.pix_fmt
-        actual_resolution = self.resolution
+        actual_pix_fmt = self.pix_fmt.value
+        actual_resolution = self.resolution.value
+
+        # The device has to be released before it can be opened again
+        if self.loader is not None:
+            self.loader.cleanup()
+            self.loader = None
 
-        self.loader = VideoCapture(
+        loader = VideoCapture(
             self.path, self.ffmpeg_env, actual_pix_fmt, actual_resolution
         )
+        self.loader = loader
         self.frame_index = 0
+        return loader
 
     def reset(self):
         """Reset the state for a new capture session"""
@@ -72,22 +85,41 @@ class VideoCaptureState:
         # close call is needed here anymore.
         self.loader = None
 
-    def update_settings(self, pix_fmt: str, resolution: str):
+    def update_settings(self, pix_fmt: PixelFormat, resolution: Resolution):
         """Update settings and recreate loader if changed"""
         # For AUTO format, we need to recreate the loader to detect capabilities
         if (
-            self.pix_fmt != pix_fmt
-            or self.resolution != resolution
-            or pix_fmt == "auto"
-            or self.pix_fmt == "auto"
+            self.pix_fmt is not pix_fmt
+            or self.resolution is not resolution
+            or pix_fmt is PixelFormat.AUTO
+            or self.pix_fmt is PixelFormat.AUTO
         ):
+            auto = PixelFormat.AUTO in (pix_fmt, self.pix_fmt)
             self.pix_fmt = pix_fmt
             self.resolution = resolution
-            self._create_loader()
+            if self.loader is None:
+                # the iterator opens the device with the new settings
+                return
+            if auto:
+                self._create_loader()
+            else:
+                # Reconfigure the open device instead of opening it again
+                self.loader.configure(pix_fmt.value, resolution.value)
+                self.frame_index = 0
+
 
+_UNLIMITED_FRAME_COUNT = 1_000_000
+"""
+The expected length of a stream without a limit.
 
-# Global dictionary for storing state
-VIDEO_LOADER_STATES = {}
+Live streams don't end, but the expected length is sent to the UI as a JSON
+number and used for progress and ETA math, so it can't be `math.inf`.
+"""
+
+
+# Global dictionary for storing state. Entries only live as long as the
+# generator using them, so states of aborted runs can't leak.
+VIDEO_LOADER_STATES: WeakValueDictionary[str, VideoCaptureState] = WeakValueDictionary()
 
 
 @video_frames_group.register(
@@ -150,54 +182,55 @@ def get_stream_from_capture_device_node(
     pixel_format: PixelFormat,
     resolution: Resolution,
 ) -> tuple[Generator[tuple[np.ndarray, int]], Path, str, float]:
-    video_dir, video_name, _ = split_file_path(path)
-
     # Retrieve or create state object
-    if path not in VIDEO_LOADER_STATES:
-        VIDEO_LOADER_STATES[path] = VideoCaptureState(
+    key = str(path)
+    state = VIDEO_LOADER_STATES.get(key)
+    if state is None:
+        state = VideoCaptureState(
             path,
             FFMpegEnv.get_integrated(node_context.storage_dir),
-            pixel_format.value,
-            resolution.value,
+            pixel_format,
+            resolution,
         )
-
-    # `state` is now guaranteed to exist
-    state = VIDEO_LOADER_STATES[path]
+        VIDEO_LOADER_STATES[key] = state
 
     # Update settings if the pixel format or resolution has changed
-    if state.pix_fmt != pixel_format.value or state.resolution != resolution.value:
-        state.update_settings(pixel_format.value, resolution.value)
+    if state.pix_fmt is not pixel_format or state.resolution is not resolution:
+        state.update_settings(pixel_format, resolution)
 
     # Add cleanup function to node context - only clean up after the node is done
     def cleanup_state():
-        if path in VIDEO_LOADER_STATES:
-            VIDEO_LOADER_STATES[path].cleanup()
-            VIDEO_LOADER_STATES.pop(path, None)
-            logger.info(f"Cleaned up VideoCapture state for path {path}")
+        cached = VIDEO_LOADER_STATES.pop(key, None)
+        if cached is not None:
+            cached.cleanup()
+            logger.debug(f"Cleaned up VideoCapture state for path {path}")
 
     # Only add cleanup after the node execution is complete
     node_context.add_cleanup(cleanup_state, after="chain")
 
     # The frame count for a live stream is conceptually infinite.
-    # Use the user-defined limit if provided, otherwise a large number.
-    frame_count = limit if use_limit else 1000000
+    # Use the user-defined limit if provided.
+    frame_count = limit if use_limit else _UNLIMITED_FRAME_COUNT
+
+    def is_aborted() -> bool:
+        return node_context.aborted
 
     def iterator():
         try:
             # Ensure we have a valid loader
-            if state.loader is None:
-                state._create_loader()
+            loader = state.loader or state._create_loader()
 
-            for index, frame in enumerate(state.loader.stream_frames()):
-                # Check if execution was aborted
-                if node_context.aborted:
-                    logger.info("Video capture aborted by user")
-                    break
-
-                yield frame, index
+            # The stream checks for aborts itself, also while waiting for the
+            # device, so a stalled camera can't block an abort.
+            frames = loader.stream_frames(should_stop=is_aborted)
+            for frame in frames:
+                yield frame, state.frame_index
                 state.frame_index += 1
                 if use_limit and state.frame_index >= limit:
                     break
+
+            if is_aborted():
+                logger.info("Video capture aborted by user")
         except Aborted:
             logger.info("Video capture aborted")
             raise
@@ -205,15 +238,16 @@ def get_stream_from_capture_device_node(
             logger.error(f"Error during video capture: {e}")
             # Clean up state on error
             state.cleanup()
-            VIDEO_LOADER_STATES.pop(path, None)
+            VIDEO_LOADER_STATES.pop(key, None)
             raise
 
-    # Hardcode a reasonable FPS, as probing is unreliable for live devices.
-    fps = 30.0
+    # The device reports the frame rate it negotiated (falling back to 30 FPS),
+    # so there is no need to probe it separately.
+    fps = state.loader.fps if state.loader is not None else 30.0
 
     return (
         Generator.from_iter(supplier=iterator, expected_length=frame_count),
-        video_dir,
-        video_name,
+        state.video_dir,
+        state.video_name,
         fps,
     )
@@ -52,6 +52,18 @@ def get_item_types(metadata: VideoMetadata):
             )
             .with_id(2)
         ),
+        BoolInput("Fast color conversion", default=False)
+        .with_docs(
+            "Use a faster, less accurate scaler when converting frames to RGB."
+            " This affects how color is upsampled and visibly smears colors at sharp color edges, which later processing (e.g. upscaling) can amplify."
+        )
+        .with_id(3),
+        BoolInput("Hardware decoding", default=False)
+        .with_docs(
+            "Decode the video on the GPU if possible. This frees up the CPU, but the speed up depends on the GPU and the codec of the video."
+            " FFMPEG falls back to software decoding if hardware decoding isn't available."
+        )
+        .with_id(4),
     ],
     outputs=[
         ImageOutput("Frame", channels=3),
@@ -76,12 +88,19 @@ def load_video_node(
     path: Path,
     use_limit: bool,
     limit: int,
+    fast_color_conversion: bool,
+    hardware_decoding: bool,
 ) -> tuple[Generator[tuple[np.ndarray, int]], Path, str, float, Any]:
     video_dir, video_name, _ = split_file_path(path)
 
-    logger.info(f"Instantiating VideoLoader with path {path}...")
-    loader = VideoLoader(path, FFMpegEnv.get_integrated(node_context.storage_dir))
-    logger.info(f"VideoLoader instantiated with metadata {loader.metadata}.")
+    logger.debug(f"Instantiating VideoLoader with path {path}...")
+    loader = VideoLoader(
+        path,
+        FFMpegEnv.get_integrated(node_context.storage_dir),
+        fast_color_conversion=fast_color_conversion,
+        hwaccel="auto" if hardware_decoding else None,
+        cache_dir=node_context.storage_dir,
+    )
 
     frame_count = loader.metadata.frame_count
     if use_limit:
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from nodes.impl.image_utils import remove_unnecessary_alpha
+
+
+@pytest.mark.parametrize(
+    ("dtype", "opaque"),
+    [
+        (np.uint8, 255),
+        (np.uint16, 65535),
+        (np.float32, 1.0),
+        (np.float64, 1.0),
+    ],
+)
+def test_remove_unnecessary_alpha(dtype: type, opaque: float):
+    img = np.full((5, 6, 4), opaque, dtype)
+    img[:, :, :3] = 0
+
+    result = remove_unnecessary_alpha(img)
+    assert result.shape == (5, 6, 3)
+    assert result.dtype == dtype
+
+    # not at a corner or the center, so it isn't seen by the quick check
+    img[1, 4, 3] = opaque / 2
+    assert remove_unnecessary_alpha(img).shape == (5, 6, 4)
+
+    img[0, 0, 3] = 0
+    assert remove_unnecessary_alpha(img).shape == (5, 6, 4)
+
+
+def test_remove_unnecessary_alpha_no_alpha():
+    img = np.zeros((5, 6, 3), np.uint8)
+    assert remove_unnecessary_alpha(img) is img
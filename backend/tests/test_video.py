@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from nodes.impl.video import _FrameReader
+
+
+def make_slots(count: int = 3) -> list[np.ndarray]:
+    return [np.zeros((2, 2, 3), np.uint8) for _ in range(count)]
+
+
+def counting_source(frames: int | None):
+    """Returns a `read_into` that writes 0, 1, 2, ... into the given frame."""
+    index = 0
+
+    def read_into(frame: np.ndarray) -> bool:
+        nonlocal index
+        if frames is not None and index >= frames:
+            return False
+        frame[:] = index % 256
+        index += 1
+        return True
+
+    return read_into
+
+
+def test_frame_reader_in_order():
+    reader = _FrameReader(counting_source(20), make_slots(), drop_stale=False)
+    try:
+        received = []
+        for frame in reader:
+            assert not frame.flags.writeable
+            received.append(int(frame[0, 0, 0]))
+            # give the reader time to run ahead, which must not drop frames
+            time.sleep(0.001)
+        assert received == list(range(20))
+    finally:
+        reader.stop()
+
+
+def test_frame_reader_stop_early():
+    reader = _FrameReader(counting_source(None), make_slots(), drop_stale=False)
+    received = []
+    for frame in reader:
+        received.append(int(frame[0, 0, 0]))
+        if len(received) == 3:
+            break
+    reader.stop()
+
+    assert received == [0, 1, 2]
+    assert not reader.running
+
+
+def test_frame_reader_exception():
+    source = counting_source(None)
+
+    def read_into(frame: np.ndarray) -> bool:
+        if source(frame) and frame[0, 0, 0] == 2:
+            raise ValueError("broken frame")
+        return True
+
+    reader = _FrameReader(read_into, make_slots(), drop_stale=False)
+    received = []
+    try:
+        with pytest.raises(ValueError, match="broken frame"):
+            for frame in reader:
+                received.append(int(frame[0, 0, 0]))
+    finally:
+        reader.stop()
+
+    assert received == [0, 1]
+
+
+def test_frame_reader_should_stop_while_waiting():
+    stalled = threading.Event()
+    release = threading.Event()
+    source = counting_source(None)
+
+    def read_into(frame: np.ndarray) -> bool:
+        if source(frame) and frame[0, 0, 0] == 0:
+            return True
+        # the source stalls after the first frame
+        stalled.set()
+        release.wait()
+        return False
+
+    stop = threading.Event()
+    reader = _FrameReader(
+        read_into, make_slots(), drop_stale=True, should_stop=stop.is_set
+    )
+    try:
+        threading.Timer(0.1, stop.set).start()
+        start = time.monotonic()
+        received = [int(frame[0, 0, 0]) for frame in reader]
+        elapsed = time.monotonic() - start
+
+        assert received == [0]
+        assert stalled.is_set()
+        assert elapsed < 2
+    finally:
+        release.set()
+        reader.stop()